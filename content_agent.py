@@ -5,17 +5,44 @@ import json
 from datetime import datetime
 import sys
 import re
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from content_analytics import analyze_content
+from pipeline_trace import Tracer, traced
+
+# Longest plan the CLI will request; one theme is generated per 4-week batch
+MAX_PLAN_WEEKS = 52
 
 class ContentAgent:
-    def __init__(self, api_key: str):
-        """Initialize with Gemini API key."""
+    def __init__(self, api_key: str, tracer: Optional[Tracer] = None):
+        """Initialize with Gemini API key and an optional tracer."""
         self.api_key = api_key
+        self.tracer = tracer or Tracer(enabled=False)
+        # Keeps multi-line debug output from concurrent plan batches from interleaving
+        self._print_lock = threading.Lock()
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-pro')
         
-    def analyze_topic(self, topic: str, industry: str) -> Dict:
-        """Analyze topic for content opportunities and market gaps."""
-        prompt = f"""
+    def _generate(self, prompt: str):
+        """Call the model, recording the network wait as a span."""
+        with self.tracer.span('model.generate_content', 'network',
+                              prompt_chars=len(prompt)) as span:
+            response = self.model.generate_content(prompt)
+            if span is not None:
+                span['response_chars'] = len(response.text)
+            return response
+    
+    def _write_json(self, data, filename: str) -> None:
+        """Write data to a JSON file, recording the write as a span."""
+        with self.tracer.span('json.dump', 'io', filename=filename):
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
+    
+    @traced('build_prompt.topic', 'prompt')
+    def _topic_prompt(self, topic: str, industry: str) -> str:
+        """Build the topic analysis prompt."""
+        return f"""
         As a content strategy expert, analyze this topic and industry:
         Topic: {topic}
         Industry: {industry}
@@ -76,9 +103,14 @@ class ContentAgent:
         Replace all item1, item2 with your actual analysis points. Each array should contain 2-4 detailed points.
         Ensure the response is valid JSON without any markdown formatting or code blocks.
         """
+    
+    @traced()
+    def analyze_topic(self, topic: str, industry: str) -> Dict:
+        """Analyze topic for content opportunities and market gaps."""
+        prompt = self._topic_prompt(topic, industry)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             text = response.text
             
             # Remove any markdown code block formatting
@@ -90,7 +122,8 @@ class ContentAgent:
             text = text.strip()
             
             try:
-                analysis = json.loads(text)
+                with self.tracer.span('json.loads', chars=len(text)):
+                    analysis = json.loads(text)
             except json.JSONDecodeError as e:
                 print(f"\nJSON Parse Error: {str(e)}")
                 print("\nAttempting to clean and parse response...")
@@ -109,8 +142,7 @@ class ContentAgent:
                     raise ValueError("Could not find valid JSON in response")
             
             # Save the analysis for the next step
-            with open('content_analysis.json', 'w') as f:
-                json.dump(analysis, f, indent=2)
+            self._write_json(analysis, 'content_analysis.json')
             
             return {
                 'analysis': analysis,
@@ -125,30 +157,52 @@ class ContentAgent:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def generate_content_plan(self, analysis: Dict) -> Dict:
-        """Generate structured content calendar based on analysis."""
-        # First, generate monthly themes
-        themes_prompt = """
-        Create 3 monthly themes for a content plan. Keep all text under 50 characters.
+    @traced('build_prompt.themes', 'prompt')
+    def _themes_prompt(self, num_batches: int) -> str:
+        """Build the monthly themes prompt."""
+        return f"""
+        Create {num_batches} monthly themes for a content plan. Keep all text under 50 characters.
         Return as a JSON array with this exact structure:
         [
-            {
+            {{
                 "month": "Month 1",
                 "theme": "Brief theme name",
                 "focus_areas": ["2-3 key areas"]
-            }
+            }}
         ]
         
         Rules:
-        1. Return exactly 3 themes
+        1. Return exactly {num_batches} themes
         2. Keep all text under 50 characters
         3. Include 2-3 focus areas per theme
-        4. Return only the JSON array
+        4. Make every theme distinct from the others
+        5. Return only the JSON array
         """
+    
+    @traced()
+    def generate_content_plan(self, analysis: Dict, weeks: int = 12, batch_weeks: int = 4,
+                              max_workers: int = 4) -> Dict:
+        """Generate structured content calendar based on analysis.
         
+        The calendar covers `weeks` weeks split into batches of `batch_weeks`, one
+        theme per batch, labelled by week range. Batches run concurrently in waves of
+        `max_workers`; each wave sees a bounded summary of the nearby themes and the
+        titles/keywords used by earlier waves. Batches in the same wave cannot see each
+        other's titles, so duplicate titles are only detected and reported after each
+        wave, not prevented. Lower `max_workers` for stricter coherence.
+        """
         try:
-            # Generate monthly themes
-            themes_response = self.model.generate_content(themes_prompt)
+            if weeks < 1:
+                raise ValueError("weeks must be at least 1")
+            if batch_weeks < 1:
+                raise ValueError("batch_weeks must be at least 1")
+            
+            num_batches = math.ceil(weeks / batch_weeks)
+            
+            # First, generate one theme per batch
+            themes_prompt = self._themes_prompt(num_batches)
+            
+            themes_response = self._generate(themes_prompt)
             themes_text = themes_response.text.strip()
             
             print("\nDebug - Raw themes response:")
@@ -162,95 +216,59 @@ class ContentAgent:
             
             monthly_themes = json.loads(themes_text)
             
-            if not isinstance(monthly_themes, list) or len(monthly_themes) != 3:
+            if not isinstance(monthly_themes, list) or len(monthly_themes) != num_batches:
                 raise ValueError("Invalid monthly themes format")
             
-            # Generate content calendar in batches
-            all_weeks = []
-            for batch in range(3):  # 3 batches of 4 weeks = 12 weeks
-                print(f"\nGenerating weeks {batch*4 + 1}-{batch*4 + 4}...")
-                
-                # Generate calendar prompt for this month's theme
-                calendar_prompt = f"""
-                Create a 4-week content calendar that aligns with this monthly theme:
-                {json.dumps(monthly_themes[batch], indent=2)}
-                
-                Keep all text under 30 characters but ensure high quality and relevance.
-                Return as a JSON array with this structure:
-                [
-                    {{
-                        "week": "Week 1",
-                        "main_content": {{
-                            "type": "Blog/Video/Guide/Case Study",
-                            "title": "Engaging title",
-                            "description": "Value proposition",
-                            "target_keywords": ["2-3 relevant terms"],
-                            "estimated_word_count": 1500
-                        }},
-                        "supporting_content": [
-                            {{
-                                "platform": "Instagram/LinkedIn/Twitter",
-                                "content_type": "Post/Video/Story",
-                                "description": "Platform-specific hook"
-                            }}
-                        ]
-                    }}
-                ]
-                
-                Rules:
-                1. Return exactly 4 weeks of content
-                2. Keep text under 30 chars but make it compelling
-                3. Ensure all content supports the monthly theme: {monthly_themes[batch]['theme']}
-                4. Vary content types and platforms strategically
-                5. Focus on delivering practical value
-                6. Include clear value propositions
-                7. Return only the JSON array
-                """
-                
-                calendar_response = self.model.generate_content(calendar_prompt)
-                calendar_text = calendar_response.text.strip()
-                
-                print(f"\nDebug - Raw calendar response (batch {batch + 1}):")
-                print(calendar_text)
-                
-                # Clean and parse calendar
-                calendar_text = self._clean_json_text(calendar_text)
-                
-                print(f"\nDebug - Cleaned calendar text (batch {batch + 1}):")
-                print(calendar_text)
-                
-                batch_calendar = json.loads(calendar_text)
-                
-                if not isinstance(batch_calendar, list) or len(batch_calendar) != 4:
-                    raise ValueError(f"Invalid calendar format in batch {batch + 1}")
-                
-                # Validate and standardize word counts
-                for week in batch_calendar:
-                    main_content = week['main_content']
-                    content_type = main_content['type'].lower()
-                    
-                    # Set default word counts based on content type
-                    if main_content['estimated_word_count'] is None or not isinstance(main_content['estimated_word_count'], int):
-                        if 'video' in content_type:
-                            main_content['estimated_word_count'] = 800  # Script length
-                        elif 'guide' in content_type:
-                            main_content['estimated_word_count'] = 2000  # Comprehensive guide
-                        elif 'case study' in content_type:
-                            main_content['estimated_word_count'] = 1500  # Detailed case study
-                        else:  # Blog or default
-                            main_content['estimated_word_count'] = 1200  # Standard blog post
+            # Label each theme by the weeks its batch covers; a batch is not always a month
+            for i, theme in enumerate(monthly_themes):
+                first_week = i * batch_weeks + 1
+                last_week = min(first_week + batch_weeks - 1, weeks)
+                theme["month"] = (f"Week {first_week}" if first_week == last_week
+                                  else f"Weeks {first_week}-{last_week}")
+            
+            # Generate content calendar in concurrent waves of batches
+            workers = max(1, max_workers)
+            batches = [None] * num_batches
+            used_titles = []
+            used_keywords = []
+            seen_titles = set()
+            duplicate_titles = []
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for wave_start in range(0, num_batches, workers):
+                    wave = range(wave_start, min(wave_start + workers, num_batches))
+                    context = self._plan_context_summary(
+                        monthly_themes, used_titles, used_keywords, wave
+                    )
+                    futures = {
+                        batch: executor.submit(
+                            self._generate_calendar_batch,
+                            monthly_themes[batch],
+                            batch * batch_weeks,
+                            min(batch_weeks, weeks - batch * batch_weeks),
+                            context
+                        )
+                        for batch in wave
+                    }
+                    for batch in wave:
+                        batches[batch] = futures[batch].result()
+                        for week in batches[batch]:
+                            main_content = week['main_content']
+                            title = main_content.get('title')
+                            if isinstance(title, str):
+                                if title.lower() in seen_titles:
+                                    duplicate_titles.append(title)
+                                seen_titles.add(title.lower())
+                                used_titles.append(title)
+                            keywords = main_content.get('target_keywords') or []
+                            if isinstance(keywords, str):
+                                keywords = [keywords]
+                            used_keywords.extend(keywords)
                     
-                    # Ensure word count is within reasonable limits
-                    if main_content['estimated_word_count'] < 500:
-                        main_content['estimated_word_count'] = 500
-                    elif main_content['estimated_word_count'] > 3000:
-                        main_content['estimated_word_count'] = 3000
-                
-                # Update week numbers
-                for i, week in enumerate(batch_calendar):
-                    week["week"] = f"Week {batch*4 + i + 1}"
-                
-                all_weeks.extend(batch_calendar)
+                    if duplicate_titles:
+                        print(f"\nWarning: duplicate titles in plan: {'; '.join(duplicate_titles)}")
+                        duplicate_titles.clear()
+            
+            all_weeks = [week for batch_calendar in batches for week in batch_calendar]
             
             # Combine into final plan
             plan = {
@@ -259,8 +277,7 @@ class ContentAgent:
             }
             
             # Save the plan
-            with open('content_plan.json', 'w') as f:
-                json.dump(plan, f, indent=2)
+            self._write_json(plan, 'content_plan.json')
             
             return {
                 'plan': plan,
@@ -272,56 +289,191 @@ class ContentAgent:
             print(f"\nError generating content plan: {str(e)}")
             if 'themes_response' in locals():
                 print(f"\nThemes response length: {len(themes_response.text)}")
-            if 'calendar_response' in locals():
-                print(f"\nCalendar response length: {len(calendar_response.text)}")
             return {
                 'error': str(e),
                 'status': 'error',
                 'timestamp': datetime.now().isoformat()
             }
     
+    def _plan_context_summary(self, monthly_themes: List[Dict], used_titles: List[str],
+                              used_keywords: List[str], wave: Optional[range] = None,
+                              theme_window: int = 2, max_titles: int = 40,
+                              max_keywords: int = 60) -> str:
+        """Build a compact, bounded summary of the plan so far for batch prompts."""
+        # Only themes near the current wave are listed, so the summary does not grow
+        # with the number of batches
+        if wave is None:
+            wave = range(len(monthly_themes))
+        first = max(0, wave.start - theme_window)
+        nearby = monthly_themes[first:wave.stop + theme_window]
+        themes = "; ".join(f"{t.get('month')}: {t.get('theme')}" for t in nearby)
+        lines = [f"Plan themes: {themes}"]
+        
+        # Only the most recent entries are kept so prompt size stays constant as the plan grows
+        titles = [t for t in used_titles if isinstance(t, str)]
+        if titles:
+            lines.append("Titles already used: " + "; ".join(titles[-max_titles:]))
+        if used_keywords:
+            unique_keywords = list(dict.fromkeys(
+                k.lower() for k in used_keywords if isinstance(k, str)
+            ))
+            lines.append("Keywords already used: " + ", ".join(unique_keywords[-max_keywords:]))
+        return "\n".join(lines)
+    
+    def _standardize_word_count(self, main_content: Dict) -> None:
+        """Default and clamp a brief's estimated word count."""
+        content_type = main_content['type'].lower()
+        
+        # Set default word counts based on content type
+        if not isinstance(main_content.get('estimated_word_count'), int):
+            if 'video' in content_type:
+                main_content['estimated_word_count'] = 800  # Script length
+            elif 'guide' in content_type:
+                main_content['estimated_word_count'] = 2000  # Comprehensive guide
+            elif 'case study' in content_type:
+                main_content['estimated_word_count'] = 1500  # Detailed case study
+            else:  # Blog or default
+                main_content['estimated_word_count'] = 1200  # Standard blog post
+        
+        # Ensure word count is within reasonable limits
+        if main_content['estimated_word_count'] < 500:
+            main_content['estimated_word_count'] = 500
+        elif main_content['estimated_word_count'] > 3000:
+            main_content['estimated_word_count'] = 3000
+    
+    @traced('build_prompt.calendar', 'prompt')
+    def _calendar_prompt(self, theme: Dict, num_weeks: int, context: str) -> str:
+        """Build the prompt for one batch of weekly briefs."""
+        return f"""
+        Create a {num_weeks}-week content calendar that aligns with this monthly theme:
+        {json.dumps(theme, indent=2)}
+        
+        Shared plan context:
+        {context}
+        
+        Keep all text under 30 characters but ensure high quality and relevance.
+        Return as a JSON array with this structure:
+        [
+            {{
+                "week": "Week 1",
+                "main_content": {{
+                    "type": "Blog/Video/Guide/Case Study",
+                    "title": "Engaging title",
+                    "description": "Value proposition",
+                    "target_keywords": ["2-3 relevant terms"],
+                    "estimated_word_count": 1500
+                }},
+                "supporting_content": [
+                    {{
+                        "platform": "Instagram/LinkedIn/Twitter",
+                        "content_type": "Post/Video/Story",
+                        "description": "Platform-specific hook"
+                    }}
+                ]
+            }}
+        ]
+        
+        Rules:
+        1. Return exactly {num_weeks} weeks of content
+        2. Keep text under 30 chars but make it compelling
+        3. Ensure all content supports the monthly theme: {theme['theme']}
+        4. Do not reuse titles already used and avoid repeating used keywords
+        5. Vary content types and platforms strategically
+        6. Focus on delivering practical value
+        7. Include clear value propositions
+        8. Return only the JSON array
+        """
+    
+    @traced()
+    def _generate_calendar_batch(self, theme: Dict, start_week: int, num_weeks: int,
+                                 context: str) -> List[Dict]:
+        """Generate one batch of weekly briefs for a single theme."""
+        label = f"weeks {start_week + 1}-{start_week + num_weeks}"
+        print(f"\nGenerating {label}...")
+        
+        calendar_prompt = self._calendar_prompt(theme, num_weeks, context)
+        
+        calendar_response = self._generate(calendar_prompt)
+        calendar_text = calendar_response.text.strip()
+        
+        # Cleaning prints several debug blocks, so hold the lock for the whole step
+        with self._print_lock:
+            print(f"\nDebug - Raw calendar response ({label}):")
+            print(calendar_text)
+            
+            # Clean and parse calendar
+            try:
+                calendar_text = self._clean_json_text(calendar_text)
+            except ValueError:
+                print(f"\nCalendar response length ({label}): {len(calendar_response.text)}")
+                raise
+            
+            print(f"\nDebug - Cleaned calendar text ({label}):")
+            print(calendar_text)
+        
+        batch_calendar = json.loads(calendar_text)
+        
+        if not isinstance(batch_calendar, list) or len(batch_calendar) != num_weeks:
+            raise ValueError(f"Invalid calendar format in {label}")
+        
+        # Validate word counts and update week numbers
+        for i, week in enumerate(batch_calendar):
+            self._standardize_word_count(week['main_content'])
+            week["week"] = f"Week {start_week + i + 1}"
+        
+        return batch_calendar
+    
+    @traced()
     def _clean_json_text(self, text: str) -> str:
         """Clean and format JSON text for parsing."""
-        # Remove markdown formatting and extract JSON
-        if "```" in text:
-            parts = text.split("```")
-            for part in parts:
-                if "{" in part or "[" in part:
-                    text = part.strip()
-                    break
-        text = text.replace("```json", "").replace("```JSON", "").replace("```", "").strip()
-        
-        # Find and extract JSON object
-        start_idx = text.find('{')
-        end_idx = text.rfind('}') + 1
-        if start_idx == -1:
-            raise ValueError("Could not find JSON object in response")
-        text = text[start_idx:end_idx]
+        with self.tracer.span('extract_json'):
+            # Remove markdown formatting and extract JSON
+            if "```" in text:
+                parts = text.split("```")
+                for part in parts:
+                    if "{" in part or "[" in part:
+                        text = part.strip()
+                        break
+            text = text.replace("```json", "").replace("```JSON", "").replace("```", "").strip()
+            
+            # Find and extract the JSON object, or the whole array when the payload is a list
+            start_idx = text.find('{')
+            array_idx = text.find('[')
+            if array_idx != -1 and (start_idx == -1 or array_idx < start_idx):
+                start_idx, end_idx = array_idx, text.rfind(']') + 1
+            else:
+                end_idx = text.rfind('}') + 1
+            if start_idx == -1:
+                raise ValueError("Could not find JSON object in response")
+            text = text[start_idx:end_idx]
         
         # Basic cleanup
-        text = text.replace('\n', ' ')
-        text = ' '.join(text.split())
+        with self.tracer.span('collapse_whitespace', chars=len(text)):
+            text = text.replace('\n', ' ')
+            text = ' '.join(text.split())
         
         print("\n=== Original JSON ===")
         print(text[:200] + "...")
         
         # Fix the actual issues we're seeing
-        # 1. Fix double-quoted colons
-        text = text.replace('"":', '":')
-        
-        # 2. Fix missing commas in arrays
-        text = re.sub(r'"\s*"([^"]+)"', '", "\1"', text)
-        
-        # 3. Fix any remaining structural issues
-        text = re.sub(r',\s*([}\]])', r'\1', text)  # Remove trailing commas
-        text = re.sub(r':\s*,', ':"",', text)  # Fix empty values
+        with self.tracer.span('regex_fixes', chars=len(text)):
+            # 1. Fix double-quoted colons
+            text = text.replace('"":', '":')
+            
+            # 2. Fix missing commas in arrays
+            text = re.sub(r'"\s*"([^"]+)"', '", "\1"', text)
+            
+            # 3. Fix any remaining structural issues
+            text = re.sub(r',\s*([}\]])', r'\1', text)  # Remove trailing commas
+            text = re.sub(r':\s*,', ':"",', text)  # Fix empty values
         
         print("\n=== Cleaned JSON ===")
         print(text[:200] + "...")
         
         try:
             # Test if valid JSON
-            parsed = json.loads(text)
+            with self.tracer.span('json.loads', chars=len(text)):
+                parsed = json.loads(text)
             return json.dumps(parsed)
         except json.JSONDecodeError as e:
             print(f"\n=== JSON Error ===")
@@ -330,9 +482,10 @@ class ContentAgent:
             print(f"Near: {text[max(0, e.colno-50):min(len(text), e.colno+50)]}")
             raise ValueError("Could not clean JSON response")
     
-    def create_content(self, brief: Dict) -> Dict:
-        """Generate actual content based on brief."""
-        prompt = f"""
+    @traced('build_prompt.content', 'prompt')
+    def _content_prompt(self, brief: Dict) -> str:
+        """Build the content creation prompt."""
+        return f"""
         Create high-quality content based on this content brief:
         {json.dumps(brief, indent=2)}
 
@@ -389,14 +542,20 @@ class ContentAgent:
         7. Ensure all JSON keys are properly quoted
         8. Return ONLY the JSON object, no additional text
         """
+    
+    @traced()
+    def create_content(self, brief: Dict) -> Dict:
+        """Generate actual content based on brief."""
+        prompt = self._content_prompt(brief)
         
         try:
             print("\nGenerating content... (this may take a moment)", flush=True)
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             
             # Save the raw response for debugging
-            with open('debug_response.txt', 'w') as f:
-                f.write(response.text)
+            with self.tracer.span('write_debug_response', 'io'):
+                with open('debug_response.txt', 'w') as f:
+                    f.write(response.text)
             
             print(f"\nResponse length: {len(response.text)}", flush=True)
             
@@ -415,22 +574,25 @@ class ContentAgent:
             text = text[start_idx:end_idx]
             
             # Basic string cleanup
-            text = text.replace('\n', ' ').replace('\r', '')
-            text = ' '.join(text.split())
+            with self.tracer.span('collapse_whitespace', chars=len(text)):
+                text = text.replace('\n', ' ').replace('\r', '')
+                text = ' '.join(text.split())
             
             print("\n=== Initial JSON ===")
             print(text[:200] + "...")
             
             try:
                 # First attempt: direct parse
-                content = json.loads(text)
+                with self.tracer.span('json.loads', chars=len(text)):
+                    content = json.loads(text)
             except json.JSONDecodeError as e:
                 print(f"\nInitial parse failed: {str(e)}")
                 
                 # Clean up common issues
-                text = text.replace('"":', '":')  # Fix double-quoted colons
-                text = re.sub(r':\s*"([^"]*?)"([^"]*?)"(?=[,}])', r':"\1\2"', text)  # Fix nested quotes
-                text = re.sub(r',\s*([}\]])', r'\1', text)  # Remove trailing commas
+                with self.tracer.span('regex_fixes', chars=len(text)):
+                    text = text.replace('"":', '":')  # Fix double-quoted colons
+                    text = re.sub(r':\s*"([^"]*?)"([^"]*?)"(?=[,}])', r':"\1\2"', text)  # Fix nested quotes
+                    text = re.sub(r',\s*([}\]])', r'\1', text)  # Remove trailing commas
                 
                 print("\n=== Cleaned JSON ===")
                 print(text[:200] + "...")
@@ -445,11 +607,24 @@ class ContentAgent:
             # Save the generated content
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f'content_{timestamp}.json'
-            with open(filename, 'w') as f:
-                json.dump(content, f, indent=2)
+            self._write_json(content, filename)
+            
+            # Compute metrics locally rather than trusting the model's word_count.
+            # The piece is already saved, so an analytics failure must not fail the call.
+            try:
+                brief_main = brief.get('main_content')
+                brief_keywords = None
+                if isinstance(brief_main, dict):
+                    brief_keywords = brief_main.get('target_keywords')
+                with self.tracer.span('analyze_content'):
+                    analytics = analyze_content(content, brief_keywords)
+            except Exception as e:
+                print(f"\nWarning: content analytics failed: {str(e)}", flush=True)
+                analytics = {'error': str(e)}
             
             return {
                 'content': content,
+                'analytics': analytics,
                 'filename': filename,
                 'status': 'success',
                 'timestamp': datetime.now().isoformat()
@@ -465,9 +640,10 @@ class ContentAgent:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def optimize_performance(self, content: Dict, metrics: Dict) -> Dict:
-        """Analyze content performance and suggest improvements."""
-        prompt = f"""
+    @traced('build_prompt.optimization', 'prompt')
+    def _optimization_prompt(self, content: Dict, metrics: Dict) -> str:
+        """Build the performance optimization prompt."""
+        return f"""
         Based on this content and its performance metrics:
         Content: {json.dumps(content)}
         Metrics: {json.dumps(metrics)}
@@ -499,9 +675,14 @@ class ContentAgent:
         
         Return as a JSON with actionable improvements.
         """
+    
+    @traced()
+    def optimize_performance(self, content: Dict, metrics: Dict) -> Dict:
+        """Analyze content performance and suggest improvements."""
+        prompt = self._optimization_prompt(content, metrics)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             optimization = json.loads(response.text)
             return {
                 'optimization': optimization,
@@ -515,7 +696,51 @@ class ContentAgent:
                 'timestamp': datetime.now().isoformat()
             }
 
+def parse_plan_weeks(text: str, default: int = 12) -> int:
+    """Parse the CLI plan length, raising ValueError for non-numeric or out-of-range input."""
+    text = text.strip().rstrip('.')
+    if not text:
+        return default
+    try:
+        weeks = int(text)
+    except ValueError:
+        raise ValueError(f"please enter a whole number of weeks between 1 and {MAX_PLAN_WEEKS}")
+    if not 1 <= weeks <= MAX_PLAN_WEEKS:
+        raise ValueError(f"plan length must be between 1 and {MAX_PLAN_WEEKS} weeks")
+    return weeks
+
+def print_analytics(analytics: Dict) -> None:
+    """Print the locally computed metrics for a content piece."""
+    if 'error' in analytics:
+        print(f"\nAnalytics unavailable: {analytics['error']}", flush=True)
+        return
+    
+    print(f"\nWord Count: {analytics['word_count']}", flush=True)
+    if analytics['reported_word_count'] is not None:
+        print(f"Model-Reported Word Count: {analytics['reported_word_count']}", flush=True)
+    
+    readability = analytics['readability']
+    print(f"Flesch Reading Ease: {readability['flesch_reading_ease']}", flush=True)
+    print(f"Flesch-Kincaid Grade: {readability['flesch_kincaid_grade']}", flush=True)
+    
+    structure = analytics['heading_structure']
+    print(f"Sections: {structure['section_count']} "
+          f"({structure['missing_headings']} without headings)", flush=True)
+    
+    if analytics['keyword_density']:
+        print("\nKeyword Density:", flush=True)
+        for keyword, stats in analytics['keyword_density'].items():
+            print(f"- {keyword}: {stats['count']} uses, {stats['density']}%", flush=True)
+
 def main():
+    # Opt-in tracing: CONTENT_AGENT_TRACE names the Chrome/Perfetto trace file to write
+    trace_path = os.getenv('CONTENT_AGENT_TRACE')
+    tracer = Tracer(
+        enabled=bool(trace_path),
+        profile=os.getenv('CONTENT_AGENT_PROFILE') == '1',
+        memory=os.getenv('CONTENT_AGENT_TRACEMALLOC') == '1'
+    )
+    
     try:
         print("=== Starting Content Agent ===", flush=True)
         
@@ -525,7 +750,8 @@ def main():
             return
         
         print("API key found, initializing agent...", flush=True)
-        agent = ContentAgent(api_key)
+        agent = ContentAgent(api_key, tracer=tracer)
+        tracer.start()
         
         while True:
             try:
@@ -575,8 +801,12 @@ def main():
                         with open('content_analysis.json', 'r') as f:
                             analysis = json.load(f)
                         
+                        print(f"\nEnter plan length in weeks (1-{MAX_PLAN_WEEKS}) "
+                              "or press Enter for 12:", flush=True)
+                        weeks = parse_plan_weeks(input())
+                        
                         print("\nGenerating content plan... (this may take a moment)", flush=True)
-                        result = agent.generate_content_plan(analysis)
+                        result = agent.generate_content_plan(analysis, weeks=weeks)
                         
                         if result['status'] == 'success':
                             print("\nContent plan generated successfully!", flush=True)
@@ -609,6 +839,8 @@ def main():
                     
                     except FileNotFoundError:
                         print("\nError: Please analyze a topic first (option 1)", flush=True)
+                    except ValueError as e:
+                        print(f"\nError: Invalid input - {str(e)}", flush=True)
                     except Exception as e:
                         print(f"\nUnexpected error: {str(e)}", flush=True)
                 
@@ -628,12 +860,13 @@ def main():
                             main = week['main_content']
                             print(f"{i}. Week {week['week']}: {main['type']} - {main['title']}", flush=True)
                         
-                        print("\nEnter the number of the content piece to create (1-12):", flush=True)
+                        total_pieces = len(plan['content_calendar'])
+                        print(f"\nEnter the number of the content piece to create (1-{total_pieces}):", flush=True)
                         content_choice = input().strip().rstrip('.')  # Remove trailing period
                         try:
                             content_choice = int(content_choice)
                             
-                            if 1 <= content_choice <= len(plan['content_calendar']):
+                            if 1 <= content_choice <= total_pieces:
                                 brief = plan['content_calendar'][content_choice - 1]
                                 print(f"\nCreating content for: {brief['main_content']['title']}", flush=True)
                                 
@@ -647,8 +880,7 @@ def main():
                                     print(f"\nTitle: {content['main_content']['title']}", flush=True)
                                     print(f"Meta Description: {content['main_content']['meta_description']}", flush=True)
                                     
-                                    if 'word_count' in content['main_content']:
-                                        print(f"\nWord Count: {content['main_content']['word_count']}", flush=True)
+                                    print_analytics(result['analytics'])
                                     
                                     print("\nSEO Elements:", flush=True)
                                     seo = content.get('seo_elements', {})
@@ -666,9 +898,9 @@ def main():
                                 else:
                                     print(f"\nError: {result['error']}", flush=True)
                             else:
-                                print("\nInvalid selection. Please choose a number between 1 and 12.", flush=True)
+                                print(f"\nInvalid selection. Please choose a number between 1 and {total_pieces}.", flush=True)
                         except ValueError:
-                            print("\nPlease enter a valid number between 1 and 12.", flush=True)
+                            print(f"\nPlease enter a valid number between 1 and {total_pieces}.", flush=True)
                     
                     except FileNotFoundError:
                         print("\nError: Please generate a content plan first (option 2)", flush=True)
@@ -699,6 +931,16 @@ def main():
     except Exception as e:
         print(f"Critical error: {str(e)}", flush=True)
         sys.exit(1)
+    
+    finally:
+        # Saved on every exit path, since failed runs are the ones worth inspecting
+        if trace_path:
+            # A failed save must not mask the original exit path
+            try:
+                tracer.stop()
+                print(f"Trace saved to {tracer.save(trace_path)}", flush=True)
+            except Exception as e:
+                print(f"Could not save trace: {str(e)}", flush=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,251 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Tokens, in match order: dotted abbreviations ("e.g."), decimals ("3.5"), Unicode words
+# with inner apostrophes ("nature's"), and sentence-ending punctuation followed by
+# whitespace or end of text
+_TOKEN_RE = re.compile(
+    r"(?:[^\W\d_]\.){2,}"
+    r"|\d+(?:[.,]\d+)+"
+    r"|[^\W_]+(?:['’][^\W_]+)*"
+    r"|[.!?]+(?=\s|$)"
+)
+_VOWEL_GROUP_RE = re.compile(r"[aeiouyàáâäæèéêëìíîïòóôöøœùúûüÿ]+")
+
+# Below this many pieces, process start-up costs more than it saves
+_INLINE_BATCH_LIMIT = 32
+
+
+@lru_cache(maxsize=16384)
+def _count_syllables(word: str) -> int:
+    """Estimate syllables in a lowercase word using vowel groups."""
+    if len(word) <= 3:
+        return 1
+    if word.endswith('e') and not word.endswith('le'):
+        word = word[:-1]
+    return max(1, len(_VOWEL_GROUP_RE.findall(word)))
+
+
+def _normalize(token: str) -> str:
+    return token.lower().replace('’', "'")
+
+
+def _as_text(value) -> str:
+    """Coerce a model-provided field to plain text."""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_as_text(item) for item in value)
+    return str(value)
+
+
+def _build_keyword_index(
+    keywords: Iterable[str]
+) -> Tuple[Dict[str, List[Tuple[str, ...]]], Dict[Tuple[str, ...], str]]:
+    """Index keyword phrases by their last token for single-pass matching."""
+    by_last_token = {}
+    labels = {}
+    for keyword in keywords:
+        text = _as_text(keyword).strip()
+        phrase = tuple(_normalize(t) for t in _TOKEN_RE.findall(text) if t[0].isalnum())
+        if not phrase or phrase in labels:
+            continue
+        labels[phrase] = text
+        by_last_token.setdefault(phrase[-1], []).append(phrase)
+    return by_last_token, labels
+
+
+def _scan(text: str, keyword_index: Dict[str, List[Tuple[str, ...]]],
+          max_phrase_len: int) -> Dict:
+    """Tokenize text once, collecting word, sentence, syllable and keyword counts."""
+    words = sentences = syllables = complex_words = 0
+    in_sentence = False
+    window = []
+    hits = Counter()
+
+    for token in _TOKEN_RE.findall(text):
+        if not token[0].isalnum():
+            if in_sentence:
+                sentences += 1
+                in_sentence = False
+            continue
+
+        word = _normalize(token)
+        words += 1
+        in_sentence = True
+        word_syllables = _count_syllables(word)
+        syllables += word_syllables
+        if word_syllables >= 3:
+            complex_words += 1
+
+        if keyword_index:
+            window.append(word)
+            if len(window) > max_phrase_len:
+                del window[0]
+            for phrase in keyword_index.get(word, ()):
+                if len(phrase) <= len(window) and tuple(window[-len(phrase):]) == phrase:
+                    hits[phrase] += 1
+
+    # Text that ends without punctuation still closes a sentence
+    if in_sentence:
+        sentences += 1
+
+    return {
+        'words': words,
+        'sentences': sentences,
+        'syllables': syllables,
+        'complex_words': complex_words,
+        'hits': hits
+    }
+
+
+def _readability(words: int, sentences: int, syllables: int, complex_words: int) -> Dict:
+    """Compute standard readability scores from aggregate counts."""
+    if not words or not sentences:
+        return {
+            'flesch_reading_ease': 0.0,
+            'flesch_kincaid_grade': 0.0,
+            'gunning_fog': 0.0,
+            'avg_sentence_length': 0.0,
+            'avg_syllables_per_word': 0.0
+        }
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+    reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    return {
+        'flesch_reading_ease': round(reading_ease, 1),
+        'flesch_kincaid_grade': round(grade, 1),
+        'gunning_fog': round(0.4 * (words_per_sentence + 100 * complex_words / words), 1),
+        'avg_sentence_length': round(words_per_sentence, 1),
+        'avg_syllables_per_word': round(syllables_per_word, 2)
+    }
+
+
+def content_keywords(content: Dict, keywords: Optional[Iterable[str]] = None) -> List[str]:
+    """Collect explicit keywords plus the piece's own SEO keywords."""
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    collected = list(keywords or [])
+    seo = content.get('seo_elements') if isinstance(content, dict) else None
+    if not isinstance(seo, dict):
+        return collected
+    if seo.get('primary_keyword'):
+        collected.append(seo['primary_keyword'])
+    secondary = seo.get('secondary_keywords') or []
+    if isinstance(secondary, str):
+        secondary = [secondary]
+    collected.extend(secondary)
+    return collected
+
+
+def analyze_content(content: Dict, keywords: Optional[Iterable[str]] = None) -> Dict:
+    """Compute word count, keyword density, readability and heading structure for a piece."""
+    main = content.get('main_content') if isinstance(content, dict) else content
+    if not isinstance(main, dict):
+        # Unstructured model output is treated as a single block of body text
+        main = {'introduction': main}
+    keyword_index, labels = _build_keyword_index(content_keywords(content, keywords))
+    max_phrase_len = max((len(phrase) for phrase in labels), default=0)
+
+    totals = Counter()
+    hits = Counter()
+    heading_hits = Counter()
+    headings = []
+
+    def scan_body(text) -> Dict:
+        stats = _scan(_as_text(text), keyword_index, max_phrase_len)
+        hits.update(stats.pop('hits'))
+        totals.update(stats)
+        return stats
+
+    def scan_heading(text: str, level: int, section_words: Optional[int] = None):
+        stats = _scan(text, keyword_index, max_phrase_len)
+        heading_hits.update(stats['hits'])
+        heading = {'level': level, 'text': text, 'word_count': stats['words']}
+        if section_words is not None:
+            heading['section_word_count'] = section_words
+        headings.append(heading)
+
+    title = _as_text(main.get('title')).strip()
+    if title:
+        scan_heading(title, 1)
+
+    scan_body(main.get('introduction'))
+
+    sections = main.get('sections') or []
+    if not isinstance(sections, list):
+        sections = [sections]
+    for section in sections:
+        if not isinstance(section, dict):
+            scan_body(section)
+            continue
+        section_stats = scan_body(section.get('content'))
+        heading = _as_text(section.get('heading')).strip()
+        if heading:
+            scan_heading(heading, 2, section_stats['words'])
+
+    scan_body(main.get('conclusion'))
+
+    words = totals['words']
+    keyword_density = {}
+    for phrase, label in labels.items():
+        count = hits[phrase]
+        keyword_density[label] = {
+            'count': count,
+            'density': round(100.0 * count * len(phrase) / words, 2) if words else 0.0,
+            'in_headings': heading_hits[phrase] > 0
+        }
+
+    section_headings = [h for h in headings if h['level'] == 2]
+    return {
+        'word_count': words,
+        'sentence_count': totals['sentences'],
+        'reported_word_count': main.get('word_count'),
+        'keyword_density': keyword_density,
+        'readability': _readability(
+            words, totals['sentences'], totals['syllables'], totals['complex_words']
+        ),
+        'heading_structure': {
+            'has_title': bool(title),
+            'section_count': len(sections),
+            'missing_headings': len(sections) - len(section_headings),
+            'empty_sections': sum(1 for h in section_headings if h['section_word_count'] == 0),
+            'headings': headings
+        }
+    }
+
+
+def _analyze_item(item: Tuple[Dict, Optional[List[str]]]) -> Dict:
+    content, keywords = item
+    return analyze_content(content, keywords)
+
+
+def analyze_batch(contents: List[Dict], keywords: Optional[List[Optional[List[str]]]] = None,
+                  max_workers: Optional[int] = None, chunksize: Optional[int] = None) -> List[Dict]:
+    """Analyze many content pieces, fanning out to a process pool for large batches.
+
+    ``keywords`` is an optional list parallel to ``contents`` with extra keywords per piece.
+    Results are returned in input order.
+    """
+    if keywords is None:
+        keywords = [None] * len(contents)
+    elif len(keywords) != len(contents):
+        raise ValueError("keywords must have one entry per content piece")
+
+    items = list(zip(contents, keywords))
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < _INLINE_BATCH_LIMIT:
+        return [_analyze_item(item) for item in items]
+
+    if chunksize is None:
+        # A few chunks per worker keeps load balanced without per-item IPC overhead
+        chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_analyze_item, items, chunksize=chunksize))
@@ -0,0 +1,165 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Opt-in span recorder that exports Chrome/Perfetto trace JSON.
+
+    Spans are recorded as complete ("X") events per thread, so nesting shows up
+    by time containment when the file is opened in chrome://tracing or ui.perfetto.dev.
+    With `profile`, cProfile runs on the thread that calls start() and, on other
+    threads, for the duration of each outermost span; all profiles are merged on save.
+    With `memory`, each span records the process-wide tracemalloc delta, which
+    includes allocations made by other threads while the span was open.
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False, memory: bool = False):
+        self.enabled = enabled
+        self.profile = enabled and profile
+        self.memory = enabled and memory
+        self._events = []
+        self._threads = {}
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._profiler = cProfile.Profile() if self.profile else None
+        self._profile_thread = None
+        self._profiling_started = False
+        self._thread_profiles = []
+        self._local = threading.local()
+        self._owns_tracemalloc = False
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def start(self) -> None:
+        """Begin optional cProfile and tracemalloc capture."""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        if self._profiler:
+            self._profile_thread = threading.get_ident()
+            self._profiler.enable()
+            self._profiling_started = True
+
+    def stop(self) -> None:
+        """Stop optional cProfile capture."""
+        if self._profiler:
+            self._profiler.disable()
+
+    def span(self, name: str, cat: str = 'pipeline', **args):
+        """Return a context manager timing a named phase; a no-op when disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    def _start_thread_profile(self) -> Optional[cProfile.Profile]:
+        """Profile an outermost span on a thread other than the one that called start()."""
+        if not self._profiler or self._profile_thread in (None, threading.get_ident()):
+            return None
+        if getattr(self._local, 'profiling', False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from the start() profiler and
+            # allows only one active profiler at a time
+            return None
+        self._local.profiling = True
+        return profiler
+
+    def _stop_thread_profile(self, profiler: Optional[cProfile.Profile]) -> None:
+        if profiler:
+            profiler.disable()
+            self._local.profiling = False
+            self._thread_profiles.append(profiler)
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: Dict):
+        thread = threading.current_thread()
+        self._threads.setdefault(thread.ident, thread.name)
+        profiler = self._start_thread_profile()
+        mem_before = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        start = self._now_us()
+        try:
+            yield args
+        finally:
+            end = self._now_us()
+            self._stop_thread_profile(profiler)
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                args['process_mem_delta_bytes'] = current - mem_before
+                self._events.append({
+                    'name': 'memory', 'ph': 'C', 'ts': end, 'pid': self._pid, 'tid': thread.ident,
+                    'args': {'current_bytes': current, 'peak_bytes': peak}
+                })
+            self._events.append({
+                'name': name, 'cat': cat, 'ph': 'X', 'ts': start, 'dur': end - start,
+                'pid': self._pid, 'tid': thread.ident, 'args': args
+            })
+
+    def _merged_profile(self, stream: io.StringIO) -> pstats.Stats:
+        stats = pstats.Stats(self._profiler, stream=stream)
+        for profiler in self._thread_profiles:
+            stats.add(profiler)
+        return stats
+
+    def _memory_summary(self, limit: int = 15) -> List[str]:
+        snapshot = tracemalloc.take_snapshot()
+        return [str(stat) for stat in snapshot.statistics('lineno')[:limit]]
+
+    def save(self, path: str) -> str:
+        """Write the trace JSON (plus a .prof file when profiling) and return its path."""
+        metadata = {}
+        # pstats cannot load a profiler that never ran, e.g. when start() was not reached
+        if self._profiler and self._profiling_started:
+            prof_path = os.path.splitext(path)[0] + '.prof'
+            stream = io.StringIO()
+            stats = self._merged_profile(stream)
+            stats.dump_stats(prof_path)
+            stats.sort_stats('cumulative').print_stats(25)
+            metadata['cprofile_file'] = prof_path
+            metadata['cprofile_top'] = [
+                line for line in stream.getvalue().splitlines() if line.strip()
+            ]
+        if self.memory and tracemalloc.is_tracing():
+            metadata['tracemalloc_top'] = self._memory_summary()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+        thread_names = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self._threads.items()
+        ]
+        with open(path, 'w') as f:
+            json.dump({
+                'traceEvents': thread_names + self._events,
+                'displayTimeUnit': 'ms',
+                'metadata': metadata
+            }, f)
+        return path
+
+
+def traced(name: Optional[str] = None, cat: str = 'pipeline'):
+    """Decorate a ContentAgent method so each call is recorded as a span."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(span_name, cat):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,102 @@
+import pytest
+
+from content_analytics import _scan, analyze_batch, analyze_content
+
+
+def _piece(text, **main):
+    main.setdefault('introduction', text)
+    return {'main_content': main}
+
+
+def test_counts_unicode_words():
+    stats = _scan("Café naïve résumé.", {}, 0)
+    assert stats['words'] == 3
+    assert stats['sentences'] == 1
+
+
+def test_decimals_and_abbreviations_do_not_end_sentences():
+    stats = _scan("It costs 3.5 dollars, e.g. cheap. Really? Yes! Ok... done", {}, 0)
+    assert stats['words'] == 10
+    assert stats['sentences'] == 5
+
+
+def test_multi_word_keyword_matching():
+    result = analyze_content(
+        _piece("Spring rebirth is here. We love spring. Spring rebirth again."),
+        ["Spring rebirth"]
+    )
+    density = result['keyword_density']['Spring rebirth']
+    assert density['count'] == 2
+    assert density['density'] == round(100.0 * 2 * 2 / result['word_count'], 2)
+
+
+def test_overlapping_keywords_are_counted_independently():
+    result = analyze_content(
+        _piece("Nature's awakening begins."), ["awakening", "nature's awakening"]
+    )
+    assert result['keyword_density']['awakening']['count'] == 1
+    assert result['keyword_density']["nature's awakening"]['count'] == 1
+
+
+def test_unicode_keyword_matches_whole_word():
+    result = analyze_content(_piece("The café opened. A cafeteria too."), ["café"])
+    assert result['keyword_density']['café']['count'] == 1
+
+
+def test_seo_keywords_are_merged_and_deduplicated():
+    content = _piece("Machine learning basics.")
+    content['seo_elements'] = {'primary_keyword': 'machine learning',
+                               'secondary_keywords': 'basics'}
+    result = analyze_content(content, ["Machine Learning"])
+    assert set(result['keyword_density']) == {'Machine Learning', 'basics'}
+
+
+def test_heading_structure():
+    content = {'main_content': {
+        'title': 'Getting Started',
+        'sections': [
+            {'heading': 'First steps', 'content': 'Install it. Run it.'},
+            {'heading': 'Empty', 'content': ''},
+            {'content': 'No heading here.'}
+        ]
+    }}
+    structure = analyze_content(content)['heading_structure']
+    assert structure['has_title']
+    assert structure['section_count'] == 3
+    assert structure['missing_headings'] == 1
+    assert structure['empty_sections'] == 1
+    assert [h['level'] for h in structure['headings']] == [1, 2, 2]
+
+
+@pytest.mark.parametrize('content', [
+    {},
+    {'main_content': None},
+    {'main_content': {}},
+    {'main_content': {'title': None, 'sections': None}},
+])
+def test_empty_or_missing_fields(content):
+    result = analyze_content(content)
+    assert result['word_count'] == 0
+    assert result['readability']['flesch_reading_ease'] == 0.0
+    assert result['heading_structure']['section_count'] == 0
+
+
+def test_non_dict_fields_are_treated_as_text():
+    assert analyze_content({'main_content': 'Just some text.'})['word_count'] == 3
+
+    result = analyze_content({'main_content': {'sections': 'One long section.'}})
+    assert result['word_count'] == 3
+    assert result['heading_structure']['section_count'] == 1
+
+
+def test_analyze_batch_preserves_order():
+    contents = [_piece(" ".join(["word"] * n)) for n in range(1, 41)]
+    keywords = [["word"]] * len(contents)
+    results = analyze_batch(contents, keywords, max_workers=2, chunksize=3)
+    assert [r['word_count'] for r in results] == list(range(1, 41))
+    assert [r['keyword_density']['word']['count'] for r in results] == list(range(1, 41))
+
+
+def test_analyze_batch_rejects_mismatched_keywords():
+    with pytest.raises(ValueError):
+        analyze_batch([_piece("a")], [["a"], ["b"]])
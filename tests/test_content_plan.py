@@ -0,0 +1,160 @@
+import json
+import random
+import re
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+
+import content_agent
+from content_agent import ContentAgent, parse_plan_weeks
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Answers theme and calendar prompts with predictable JSON."""
+
+    def __init__(self, jitter=0.0, keywords=None, title=lambda theme, i: f"{theme} post {i}"):
+        self.prompts = []
+        self.jitter = jitter
+        self.keywords = keywords
+        self.title = title
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        themes = re.search(r"Create (\d+) monthly themes", prompt)
+        if themes:
+            return _Response(json.dumps([
+                {"month": "Month 1", "theme": f"Theme{i}", "focus_areas": ["a", "b"]}
+                for i in range(int(themes.group(1)))
+            ]))
+
+        num_weeks = int(re.search(r"Create a (\d+)-week", prompt).group(1))
+        theme = re.search(r"monthly theme: (\S+)", prompt).group(1)
+        if self.jitter:
+            time.sleep(random.random() * self.jitter)
+        return _Response(json.dumps([
+            {
+                "week": "Week 1",
+                "main_content": {
+                    "type": "Blog",
+                    "title": self.title(theme, i),
+                    "description": "d",
+                    "target_keywords": self.keywords or [f"{theme.lower()} kw{i}"],
+                    "estimated_word_count": None
+                },
+                "supporting_content": []
+            }
+            for i in range(num_weeks)
+        ]))
+
+
+@pytest.fixture
+def make_agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def factory(model):
+        agent = ContentAgent('test-key')
+        agent.model = model
+        return agent
+    return factory
+
+
+def _calendar_prompts(model):
+    return [p for p in model.prompts if 'week content calendar' in p]
+
+
+def test_partial_last_batch_and_week_renumbering(make_agent):
+    model = StubModel()
+    result = make_agent(model).generate_content_plan({}, weeks=5, batch_weeks=2)
+
+    assert result['status'] == 'success'
+    plan = result['plan']
+    assert [w['week'] for w in plan['content_calendar']] == [f"Week {i}" for i in range(1, 6)]
+    assert [t['month'] for t in plan['monthly_themes']] == ["Weeks 1-2", "Weeks 3-4", "Week 5"]
+    assert sorted(re.search(r"Create a (\d+)-week", p).group(1)
+                  for p in _calendar_prompts(model)) == ['1', '2', '2']
+
+
+def test_results_keep_batch_order_across_waves(make_agent):
+    model = StubModel(jitter=0.02)
+    result = make_agent(model).generate_content_plan({}, weeks=20, batch_weeks=2, max_workers=3)
+
+    calendar = result['plan']['content_calendar']
+    expected = [f"Theme{i // 2} post {i % 2}" for i in range(20)]
+    assert [w['main_content']['title'] for w in calendar] == expected
+
+
+def test_earlier_wave_context_reaches_later_prompts(make_agent):
+    model = StubModel()
+    make_agent(model).generate_content_plan({}, weeks=12, batch_weeks=4, max_workers=1)
+
+    prompts = _calendar_prompts(model)
+    assert "Titles already used" not in prompts[0]
+    assert "Theme0 post 3" in prompts[1]
+    assert "Theme1 post 0" in prompts[2]
+    assert "theme1 kw2" in prompts[2]
+
+
+def test_string_keywords_are_not_split_into_characters(make_agent):
+    model = StubModel(keywords="seo tips")
+    result = make_agent(model).generate_content_plan({}, weeks=8, batch_weeks=4, max_workers=1)
+
+    assert result['status'] == 'success'
+    later_prompt = _calendar_prompts(model)[1]
+    assert "Keywords already used: seo tips" in later_prompt
+    assert "s, e, o" not in later_prompt
+
+
+def test_non_string_titles_do_not_break_context(make_agent):
+    model = StubModel(title=lambda theme, i: None if i == 0 else i)
+    agent = make_agent(model)
+    result = agent.generate_content_plan({}, weeks=8, batch_weeks=4, max_workers=1)
+
+    assert result['status'] == 'success'
+    assert "Titles already used" not in _calendar_prompts(model)[1]
+
+    summary = agent._plan_context_summary([], [None, 3, "Real title"], [])
+    assert "Titles already used: Real title" in summary
+
+
+def test_context_summary_is_bounded_and_deduplicated(make_agent):
+    agent = make_agent(StubModel())
+    themes = [{"month": f"Weeks {i}", "theme": f"Theme{i}"} for i in range(50)]
+    titles = [f"Title {i}" for i in range(100)]
+    keywords = ["AI", "ai", "ml"] * 50
+
+    summary = agent._plan_context_summary(themes, titles, keywords, wave=range(20, 22),
+                                          theme_window=2, max_titles=5)
+
+    assert "Theme17" not in summary and "Theme18" in summary
+    assert "Theme23" in summary and "Theme24" not in summary
+    assert "Title 94" not in summary and "Title 95" in summary
+    assert "Keywords already used: ai, ml" in summary
+
+
+def test_duplicate_titles_are_reported(make_agent, capsys):
+    model = StubModel(title=lambda theme, i: "Same title")
+    result = make_agent(model).generate_content_plan({}, weeks=4, batch_weeks=2)
+
+    assert result['status'] == 'success'
+    assert "Warning: duplicate titles in plan: Same title" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('text, weeks', [("", 12), ("26", 26), (" 52. ", 52), ("1", 1)])
+def test_parse_plan_weeks_accepts_valid_input(text, weeks):
+    assert parse_plan_weeks(text) == weeks
+
+
+@pytest.mark.parametrize('text', ["abc", "0", "-4", str(content_agent.MAX_PLAN_WEEKS + 1)])
+def test_parse_plan_weeks_rejects_invalid_input(text):
+    with pytest.raises(ValueError):
+        parse_plan_weeks(text)
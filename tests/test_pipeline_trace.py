@@ -0,0 +1,76 @@
+import json
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline_trace import Tracer
+
+
+def _busy_work():
+    return sum(i * i for i in range(1000))
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer(enabled=False)
+    with tracer.span('phase') as span:
+        assert span is None
+    path = tracer.save(str(tmp_path / 'trace.json'))
+    assert json.load(open(path))['traceEvents'] == []
+
+
+def test_spans_export_chrome_trace(tmp_path):
+    tracer = Tracer()
+    with tracer.span('outer', chars=10):
+        with tracer.span('inner', 'io') as span:
+            span['extra'] = 1
+    trace = json.load(open(tracer.save(str(tmp_path / 'trace.json'))))
+
+    spans = {e['name']: e for e in trace['traceEvents'] if e['ph'] == 'X'}
+    assert set(spans) == {'outer', 'inner'}
+    assert spans['inner']['cat'] == 'io'
+    assert spans['inner']['args'] == {'extra': 1}
+    assert spans['outer']['args'] == {'chars': 10}
+    # Nesting is expressed by time containment on the same thread
+    assert spans['outer']['ts'] <= spans['inner']['ts']
+    inner_end = spans['inner']['ts'] + spans['inner']['dur']
+    assert inner_end <= spans['outer']['ts'] + spans['outer']['dur']
+    assert any(e['ph'] == 'M' and e['name'] == 'thread_name' for e in trace['traceEvents'])
+
+
+def test_memory_deltas_are_labelled_process_wide(tmp_path):
+    tracer = Tracer(memory=True)
+    tracer.start()
+    with tracer.span('alloc'):
+        data = [0] * 10000
+    trace = json.load(open(tracer.save(str(tmp_path / 'trace.json'))))
+    del data
+
+    span = next(e for e in trace['traceEvents'] if e['name'] == 'alloc')
+    assert 'process_mem_delta_bytes' in span['args']
+    assert 'tracemalloc_top' in trace['metadata']
+
+
+def test_profile_includes_worker_thread_spans(tmp_path):
+    tracer = Tracer(profile=True)
+    tracer.start()
+
+    def work():
+        with tracer.span('batch'):
+            return _busy_work()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda _: work(), range(4)))
+    tracer.stop()
+    trace = json.load(open(tracer.save(str(tmp_path / 'trace.json'))))
+
+    stats = pstats.Stats(trace['metadata']['cprofile_file'])
+    calls = {func[2]: stat[1] for func, stat in stats.stats.items()}
+    assert calls.get('_busy_work') == 4
+
+
+def test_save_without_start_skips_profile(tmp_path):
+    tracer = Tracer(profile=True)
+    tracer.stop()
+    trace = json.load(open(tracer.save(str(tmp_path / 'trace.json'))))
+
+    assert 'cprofile_file' not in trace['metadata']
+    assert not (tmp_path / 'trace.prof').exists()